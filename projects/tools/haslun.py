@@ -7,32 +7,153 @@ Creates new templates and pages for the Haslun projects ecosystem.
 Usage:
     python tools/haslun.py new-template posters --from cards
     python tools/haslun.py new-page cards birthday-jane --title "Happy Birthday, Jane"
+    python tools/haslun.py new-pages pages.ndjson
     python tools/haslun.py list
+    python tools/haslun.py list --rescan
 """
 
 from __future__ import annotations
 
 import argparse
+import atexit
+import io
 import json
 import os
 import re
-import shutil
+from collections.abc import Iterator
 from pathlib import Path
-from datetime import date
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+# JSON helpers take binary file objects. orjson works on whole byte
+# strings; the stdlib fallback streams straight to/from the file.
+if orjson is not None:
+    def _load(f):
+        return orjson.loads(f.read())
+
+    def _dump(obj, f):
+        f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+else:
+    _load = json.load
+
+    def _dump(obj, f):
+        text = io.TextIOWrapper(f, encoding="utf-8", newline="\n")
+        json.dump(obj, text, indent=2, ensure_ascii=False)
+        text.flush()
+        text.detach()
 
 # Resolve paths relative to this script
 ROOT = Path(__file__).resolve().parents[1]  # projects/ folder
 REGISTRY = ROOT / "registry.json"
 
+_SLUG_NONALNUM = re.compile(r"[^a-z0-9]+")
+_SLUG_DASHES = re.compile(r"-{2,}")
+_CANONICAL_SLUG = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*\Z")
+# <title> element or og:title meta content, rewritten together in new_page
+_TITLE_TAGS_RE = re.compile(
+    r'(<title>.*?</title>)|(property="og:title"\s+content="[^"]*")', re.DOTALL)
+
+# Skeleton files for `new-template` without --from
+_APP_JSON_SKELETON = {
+    "id": None,
+    "title": None,
+    "type": None,
+    "modeDefault": "glass",
+    "loader": "dom",
+    "share": {"noIndex": True, "ogImage": "og.png"},
+    "atmosphere": {"livingWashes": True},
+}
+
+_INDEX_HTML_TEMPLATE = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <meta name="robots" content="noindex, nofollow">
+  <title>{category_title} Template</title>
+  <meta property="og:title" content="{category_title} Template">
+  <meta property="og:image" content="./og.png">
+  
+  <!-- Early boot -->
+  <script src="../../shared/assets/js/boot.js"></script>
+  <script>HaslunBoot.early();</script>
+  
+  <!-- Styles -->
+  <link rel="stylesheet" href="../../shared/assets/css/base.css">
+  <link rel="stylesheet" href="../../shared/ui/loader.css">
+  <link rel="stylesheet" href="../../shared/ui/glass-overlay.css">
+  <link rel="stylesheet" href="../../shared/ui/pixel-overlay.css">
+</head>
+<body>
+  <div class="loading" id="loading">
+    <div class="loading-content">
+      <p class="loading-text">loading...</p>
+      <div class="loading-bar">
+        <div class="loading-bar-fill" id="loading-fill"></div>
+      </div>
+    </div>
+  </div>
+
+  <main>
+    <h1>{category_title} Template</h1>
+    <p>Edit this template to create your {category}.</p>
+  </main>
+
+  <script src="../../shared/watercolor-engine/watercolor-engine.js"></script>
+  <script src="../../shared/assets/js/loader.js"></script>
+  <script src="../../shared/assets/js/atmosphere.js"></script>
+  <script src="../../shared/assets/js/pixel-mode.js"></script>
+  
+  <script>
+    async function init() {{
+      const ctx = await HaslunBoot.boot({{ configUrl: './app.json' }});
+      await ctx.preloadAndInit([]);
+    }}
+    init();
+  </script>
+</body>
+</html>
+'''
+
+# Parsed JSON is cached per process; saves only mark entries dirty and
+# _flush_registry() writes them out (at the end of main() and at exit).
+_registry_cache: dict | None = None
+_registry_dirty = False
+_category_cache: dict[str, dict] = {}
+_category_dirty: set[str] = set()
+
 
 def slugify(s: str) -> str:
     """Convert a string to a URL-safe slug."""
+    if _CANONICAL_SLUG.match(s):
+        return s
     s = s.strip().lower()
-    s = re.sub(r"[^a-z0-9]+", "-", s)
-    s = re.sub(r"-{2,}", "-", s).strip("-")
+    s = _SLUG_NONALNUM.sub("-", s)
+    s = _SLUG_DASHES.sub("-", s).strip("-")
     return s or "untitled"
 
 
+def _fast_copytree(src: str | Path, dst: str | Path):
+    """Copy a template tree without per-file stat metadata.
+
+    Scaffolded files are edited right away, so copystat is skipped and
+    shutil.copyfile gets to use the platform's kernel fast-copy path.
+    """
+    import shutil
+
+    os.mkdir(dst)
+    with os.scandir(src) as it:
+        for entry in it:
+            target = os.path.join(dst, entry.name)
+            if entry.is_dir():
+                _fast_copytree(entry.path, target)
+            else:
+                shutil.copyfile(entry.path, target)
+
+
 def ensure_projects_root():
     """Verify we're running from the correct location."""
     if not ROOT.exists():
@@ -41,35 +162,88 @@ def ensure_projects_root():
 
 def load_registry() -> dict:
     """Load the project registry."""
-    if REGISTRY.exists():
-        return json.loads(REGISTRY.read_text(encoding="utf-8"))
-    return {"projects": [], "categories": {}}
+    global _registry_cache
+    if _registry_cache is None:
+        if REGISTRY.exists():
+            with REGISTRY.open("rb") as f:
+                _registry_cache = _load(f)
+        else:
+            _registry_cache = {"projects": [], "categories": {}}
+        # Id lookup for the projects list; stripped again before saving
+        _registry_cache["_id_index"] = {
+            p["id"]: p for p in _registry_cache.get("projects", [])
+        }
+    return _registry_cache
 
 
 def save_registry(reg: dict):
-    """Save the project registry."""
-    REGISTRY.write_text(json.dumps(reg, indent=2), encoding="utf-8")
+    """Save the project registry (written on the next flush)."""
+    global _registry_cache, _registry_dirty
+    _registry_cache = reg
+    _registry_dirty = True
+
+
+def _category_index_path(category: str) -> str:
+    """Path to a category's index.json as a plain string."""
+    return os.path.join(ROOT, category, "index.json")
 
 
 def load_category_index(category: str) -> dict:
     """Load a category's index.json."""
-    index_path = ROOT / category / "index.json"
-    if index_path.exists():
-        return json.loads(index_path.read_text(encoding="utf-8"))
-    return {"category": category, "pages": []}
+    if category not in _category_cache:
+        index_path = _category_index_path(category)
+        if os.path.exists(index_path):
+            with open(index_path, "rb") as f:
+                _category_cache[category] = _load(f)
+        else:
+            _category_cache[category] = {"category": category, "pages": []}
+    return _category_cache[category]
 
 
 def save_category_index(category: str, data: dict):
-    """Save a category's index.json."""
-    index_path = ROOT / category / "index.json"
-    index_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
-
-
-def add_category_if_missing(reg: dict, category: str):
+    """Save a category's index.json (written on the next flush)."""
+    _category_cache[category] = data
+    _category_dirty.add(category)
+
+
+def _atomic_write_json(path: str | Path, obj):
+    """Write JSON to a sibling .tmp file, then rename it over the target."""
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            _dump(obj, f)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _flush_registry():
+    """Write any pending registry and category index changes to disk."""
+    global _registry_dirty
+    # Clear the dirty state first so a failed write isn't retried (and
+    # reported twice) by the atexit hook after main() already flushed.
+    registry_dirty, _registry_dirty = _registry_dirty, False
+    categories = sorted(_category_dirty)
+    _category_dirty.clear()
+    if registry_dirty:
+        reg = {k: v for k, v in _registry_cache.items() if k != "_id_index"}
+        _atomic_write_json(REGISTRY, reg)
+    for category in categories:
+        _atomic_write_json(_category_index_path(category), _category_cache[category])
+
+
+atexit.register(_flush_registry)
+
+
+def add_category_if_missing(reg: dict, category: str, label: str | None = None):
     """Add a category to the registry if it doesn't exist."""
     if category not in reg.get("categories", {}):
         reg.setdefault("categories", {})[category] = {
-            "label": category.replace("-", " ").title(),
+            "label": label or category.replace("-", " ").title(),
             "icon": "📄",
             "status": "active"
         }
@@ -79,6 +253,7 @@ def new_template(category: str, from_category: str | None):
     """Create a new template category."""
     ensure_projects_root()
     category = slugify(category)
+    label = category.replace("-", " ").title()
     dst = ROOT / category / "_template"
 
     if dst.exists():
@@ -90,100 +265,49 @@ def new_template(category: str, from_category: str | None):
         src = ROOT / slugify(from_category) / "_template"
         if not src.exists():
             raise SystemExit(f"Source template not found: {src}")
-        shutil.copytree(src, dst)
+        _fast_copytree(src, dst)
         print(f"✅ Copied template from {from_category}")
     else:
         # Create minimal skeleton
-        dst.mkdir(parents=True, exist_ok=True)
-        (dst / "assets").mkdir(exist_ok=True)
-        (dst / "assets" / "css").mkdir(parents=True, exist_ok=True)
-        (dst / "assets" / "js").mkdir(parents=True, exist_ok=True)
-        (dst / "assets" / "img").mkdir(parents=True, exist_ok=True)
+        cat_title = category.title()
+        for sub in ("assets/css", "assets/js", "assets/img"):
+            (dst / sub).mkdir(parents=True, exist_ok=True)
         
         # Create app.json
-        (dst / "app.json").write_text(json.dumps({
-            "id": f"{category}-template",
-            "title": f"{category.title()} Template",
-            "type": category,
-            "modeDefault": "glass",
-            "loader": "dom",
-            "share": {"noIndex": True, "ogImage": "og.png"},
-            "atmosphere": {"livingWashes": True}
-        }, indent=2), encoding="utf-8")
+        with (dst / "app.json").open("wb") as f:
+            _dump({
+                **_APP_JSON_SKELETON,
+                "id": f"{category}-template",
+                "title": f"{cat_title} Template",
+                "type": category,
+            }, f)
         
         # Create minimal index.html
-        (dst / "index.html").write_text(f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-  <meta charset="UTF-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <meta name="robots" content="noindex, nofollow">
-  <title>{category.title()} Template</title>
-  <meta property="og:title" content="{category.title()} Template">
-  <meta property="og:image" content="./og.png">
-  
-  <!-- Early boot -->
-  <script src="../../shared/assets/js/boot.js"></script>
-  <script>HaslunBoot.early();</script>
-  
-  <!-- Styles -->
-  <link rel="stylesheet" href="../../shared/assets/css/base.css">
-  <link rel="stylesheet" href="../../shared/ui/loader.css">
-  <link rel="stylesheet" href="../../shared/ui/glass-overlay.css">
-  <link rel="stylesheet" href="../../shared/ui/pixel-overlay.css">
-</head>
-<body>
-  <div class="loading" id="loading">
-    <div class="loading-content">
-      <p class="loading-text">loading...</p>
-      <div class="loading-bar">
-        <div class="loading-bar-fill" id="loading-fill"></div>
-      </div>
-    </div>
-  </div>
-
-  <main>
-    <h1>{category.title()} Template</h1>
-    <p>Edit this template to create your {category}.</p>
-  </main>
-
-  <script src="../../shared/watercolor-engine/watercolor-engine.js"></script>
-  <script src="../../shared/assets/js/loader.js"></script>
-  <script src="../../shared/assets/js/atmosphere.js"></script>
-  <script src="../../shared/assets/js/pixel-mode.js"></script>
-  
-  <script>
-    async function init() {{
-      const ctx = await HaslunBoot.boot({{ configUrl: './app.json' }});
-      await ctx.preloadAndInit([]);
-    }}
-    init();
-  </script>
-</body>
-</html>
-''', encoding="utf-8")
+        html_text = _INDEX_HTML_TEMPLATE.format(category=category, category_title=cat_title)
+        (dst / "index.html").write_bytes(html_text.encode("utf-8"))
 
     # Create category index.json
     save_category_index(category, {
         "category": category,
-        "title": category.replace("-", " ").title(),
+        "title": label,
         "pages": []
     })
 
     # Update main registry
     reg = load_registry()
-    add_category_if_missing(reg, category)
+    add_category_if_missing(reg, category, label)
     
     # Add to projects list if not there
     project_entry = {
         "id": category,
-        "title": category.replace("-", " ").title(),
+        "title": label,
         "path": f"/projects/{category}/",
         "category": category,
         "status": "template"
     }
-    if not any(p["id"] == category for p in reg.get("projects", [])):
+    if category not in reg["_id_index"]:
         reg.setdefault("projects", []).append(project_entry)
+        reg["_id_index"][category] = project_entry
     
     save_registry(reg)
     print(f"✅ Created template: {dst}")
@@ -191,6 +315,8 @@ def new_template(category: str, from_category: str | None):
 
 def new_page(category: str, slug: str, title: str | None):
     """Create a new page from a template."""
+    from datetime import date
+
     ensure_projects_root()
     category = slugify(category)
     slug = slugify(slug)
@@ -203,26 +329,49 @@ def new_page(category: str, slug: str, title: str | None):
     if dst.exists():
         raise SystemExit(f"Destination already exists: {dst}")
 
-    shutil.copytree(tmpl, dst)
+    _fast_copytree(tmpl, dst)
 
     # Update app.json
-    app_json = dst / "app.json"
-    if app_json.exists():
-        data = json.loads(app_json.read_text(encoding="utf-8"))
+    app_json = os.path.join(dst, "app.json")
+    if os.path.exists(app_json):
+        with open(app_json, "rb") as f:
+            data = _load(f)
         data["id"] = f"{category}:{slug}"
         if title:
             data["title"] = title
         data["created"] = str(date.today())
-        app_json.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        with open(app_json, "wb") as f:
+            _dump(data, f)
 
     # Update <title> and og:title in index.html
     if title:
-        index = dst / "index.html"
-        if index.exists():
-            html = index.read_text(encoding="utf-8")
-            html = re.sub(r"<title>.*?</title>", f"<title>{title}</title>", html, flags=re.DOTALL)
-            html = re.sub(r'property="og:title"\s+content=".*?"', f'property="og:title" content="{title}"', html)
-            index.write_text(html, encoding="utf-8")
+        index = os.path.join(dst, "index.html")
+        if os.path.exists(index):
+            import html
+
+            # Element text needs &, < and > escaped; the double-quoted
+            # attribute only & and ", so apostrophes stay readable in both.
+            title_tag = f"<title>{html.escape(title, quote=False)}</title>"
+            og_value = title.replace("&", "&amp;").replace('"', "&quot;")
+            og_tag = f'property="og:title" content="{og_value}"'
+
+            # Both tags live in <head>; if the template already carries this
+            # title (e.g. the default one), skip the read-modify-write.
+            with open(index, "rb") as f:
+                head = f.read(4096)
+                if title_tag.encode("utf-8") in head and og_tag.encode("utf-8") in head:
+                    html_text = None
+                else:
+                    html_text = (head + f.read()).decode("utf-8")
+
+            if html_text is not None:
+                # A callable replacement keeps backslashes in the title literal
+                def _rep(m):
+                    return title_tag if m.group(1) else og_tag
+
+                html_text = _TITLE_TAGS_RE.sub(_rep, html_text, count=2)
+                with open(index, "wb") as f:
+                    f.write(html_text.encode("utf-8"))
 
     # Update category index
     cat_index = load_category_index(category)
@@ -238,7 +387,67 @@ def new_page(category: str, slug: str, title: str | None):
     print(f"🔗 URL: /projects/{category}/{slug}/")
 
 
-def list_projects():
+def new_pages(spec: str):
+    """Create several pages from an NDJSON spec in one run.
+
+    Each line is {"category": ..., "slug": ..., "title": ...}; title is
+    optional. The whole spec is validated before anything is created.
+    Repeated category/slug pairs and pages that already exist are
+    skipped, so re-running a spec only creates what is missing. Registry
+    and index files are loaded once and written once at the end.
+    """
+    ensure_projects_root()
+    pages = []
+    seen = set()
+    with open(spec, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            where = f"{spec}:{lineno}"
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                raise SystemExit(f"{where}: invalid JSON ({e})")
+            if not isinstance(item, dict):
+                raise SystemExit(f"{where}: expected an object with category and slug")
+            category, slug, title = item.get("category"), item.get("slug"), item.get("title")
+            if not isinstance(category, str) or not isinstance(slug, str):
+                raise SystemExit(f"{where}: category and slug must be strings")
+            if title is not None and not isinstance(title, str):
+                raise SystemExit(f"{where}: title must be a string or null")
+            key = (slugify(category), slugify(slug))
+            if key in seen:
+                print(f"⏭️  Skipping duplicate: {key[0]}/{key[1]}")
+                continue
+            seen.add(key)
+            if not (ROOT / key[0] / "_template").exists():
+                raise SystemExit(f"{where}: template not found: {ROOT / key[0] / '_template'}")
+            pages.append((key, title))
+
+    for (category, slug), title in pages:
+        if (ROOT / category / slug).exists():
+            print(f"⏭️  Skipping existing: {category}/{slug}")
+            continue
+        new_page(category, slug, title)
+
+
+def _scan_categories() -> Iterator[str]:
+    """Yield category folders on disk, i.e. those holding a _template.
+
+    Hidden and underscore-prefixed entries (including _template folders
+    themselves) are never categories, so they are rejected by name before
+    is_dir(), which can still cost a stat on some network filesystems.
+    """
+    with os.scandir(ROOT) as it:
+        for e in it:
+            if e.name.startswith(("_", ".")):
+                continue
+            if e.is_dir(follow_symlinks=False):
+                if os.path.isdir(os.path.join(e.path, "_template")):
+                    yield e.name
+
+
+def list_projects(rescan: bool = False):
     """List all projects and categories."""
     ensure_projects_root()
     reg = load_registry()
@@ -254,6 +463,28 @@ def list_projects():
         status = proj.get("status", "unknown")
         emoji = "✅" if status == "live" else "📝" if status == "template" else "⏳"
         print(f"  {emoji} {proj['title']} → {proj['path']}")
+
+    if rescan:
+        categories = reg.get("categories", {})
+        on_disk = sorted(_scan_categories())
+        print("\n🔍 On disk:")
+        for name in on_disk:
+            note = "" if name in categories else "  ⚠️ not in registry"
+            print(f"  {name}{note}")
+
+        missing = [f"category {name} (no {name}/_template)"
+                   for name in categories if name not in on_disk]
+        for proj in reg.get("projects", []):
+            path = proj.get("path", "")
+            if not path.startswith("/projects/"):
+                continue  # only paths under projects/ map onto ROOT
+            folder = path[len("/projects/"):].strip("/")
+            if folder and not os.path.isdir(os.path.join(ROOT, folder)):
+                missing.append(f"project {proj['id']} ({proj['path']})")
+        if missing:
+            print("\n⚠️  In registry but missing on disk:")
+            for item in missing:
+                print(f"  {item}")
     
     print()
 
@@ -277,8 +508,14 @@ def main():
     n.add_argument("slug", help="Page slug (e.g., 'birthday-jane')")
     n.add_argument("--title", default=None, help="Page title")
 
+    # new-pages command
+    b = sub.add_parser("new-pages", help="Create many pages from an NDJSON spec")
+    b.add_argument("spec", help="NDJSON file: one {category, slug, title} per line")
+
     # list command
-    sub.add_parser("list", help="List all projects and categories")
+    ls = sub.add_parser("list", help="List all projects and categories")
+    ls.add_argument("--rescan", action="store_true",
+                    help="Also scan the projects folder for categories on disk")
 
     args = p.parse_args()
 
@@ -286,8 +523,12 @@ def main():
         new_template(args.category, args.from_category)
     elif args.cmd == "new-page":
         new_page(args.category, args.slug, args.title)
+    elif args.cmd == "new-pages":
+        new_pages(args.spec)
     elif args.cmd == "list":
-        list_projects()
+        list_projects(args.rescan)
+
+    _flush_registry()
 
 
 if __name__ == "__main__":